@@ -3,7 +3,7 @@ Freelist analysis module for analyzing potential target objects and their relati
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Sequence, Set
 from enum import Enum
 import networkx as nx
 
@@ -14,14 +14,14 @@ class ObjectClass(Enum):
     DANGEROUS = "dangerous"
     UNKNOWN = "unknown"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ObjectMetadata:
     """Metadata about a potential target object."""
     name: str
     size: int
     alignment: int
     class_type: ObjectClass
-    dangerous_fields: List[str]
+    dangerous_fields: Sequence[str]
     vtable_offset: Optional[int] = None
     metadata_size: int = 0
 
@@ -2,12 +2,13 @@
 JavaScript heap manipulation module for generating heap spray and defragmentation code.
 """
 
-from typing import List, Dict, Optional
+from collections import deque
+from typing import Deque, List, Dict, Optional
 from dataclasses import dataclass
 import random
 import string
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SprayConfig:
     """Configuration for heap spray operations."""
     target_size: int
@@ -19,8 +20,9 @@ class SprayConfig:
 class HeapManipulator:
     """Generates JavaScript code for heap manipulation."""
     
-    def __init__(self):
-        self.spray_history: List[SprayConfig] = []
+    def __init__(self, history_size: int = 1024):
+        # Bounded so long fuzzing sessions don't grow without limit
+        self.spray_history: Deque[SprayConfig] = deque(maxlen=history_size)
         
     def generate_spray_code(self, config: SprayConfig) -> str:
         """Generate JavaScript code for heap spraying."""
@@ -3,7 +3,6 @@ Main entry point for the heap grooming toolkit.
 """
 
 import argparse
-import json
 from typing import Optional
 from rich.console import Console
 from rich.prompt import Prompt
@@ -16,27 +15,94 @@ from strategy.generator import StrategyGenerator, GroomingStrategy
 from visualization.heap_viewer import HeapViewer, HeapSnapshot
 from bug_mode.analyzer import BugAnalyzer, BugConfig, BugType, TargetObject
 
+# Shared across HeapGroomer instances so terminal probing happens once
+_CONSOLE = Console()
+
+# Phase banners are static, so they are built once at import time
+_PANELS = {
+    "phase1": Panel("Starting Allocator Analysis", title="Phase 1"),
+    "phase2": Panel("Generating Heap Spray", title="Phase 2"),
+    "phase3": Panel("Analyzing Freelist", title="Phase 3"),
+    "phase4": Panel("Generating Grooming Strategy", title="Phase 4"),
+    "phase5": Panel("Visualizing Heap State", title="Phase 5"),
+    "phase6": Panel("Analyzing Bug Scenario", title="Phase 6"),
+}
+
+# Common target objects, built once and shared by every analysis run
+_COMMON_OBJECTS = (
+    ObjectMetadata(
+        name="ArrayBuffer",
+        size=0x20,
+        alignment=8,
+        class_type=ObjectClass.DANGEROUS,
+        dangerous_fields=("data", "length"),
+        vtable_offset=0x8
+    ),
+    ObjectMetadata(
+        name="JSFunction",
+        size=0x30,
+        alignment=8,
+        class_type=ObjectClass.DANGEROUS,
+        dangerous_fields=("code", "scope"),
+        vtable_offset=0x0
+    ),
+    ObjectMetadata(
+        name="TypedArray",
+        size=0x40,
+        alignment=8,
+        class_type=ObjectClass.DANGEROUS,
+        dangerous_fields=("buffer", "length"),
+        vtable_offset=0x8
+    )
+)
+
+# Sample heap snapshots for visualization; snapshots are immutable, so
+# every run shares these
+_SAMPLE_SNAPSHOTS = (
+    HeapSnapshot.from_bucket_states(
+        timestamp=0,
+        bucket_states={
+            0x20: {"free": 10, "occupied": 5},
+            0x30: {"free": 8, "occupied": 3},
+            0x40: {"free": 6, "occupied": 4}
+        },
+        total_allocated=1000,
+        total_free=2000
+    ),
+    HeapSnapshot.from_bucket_states(
+        timestamp=1,
+        bucket_states={
+            0x20: {"free": 8, "occupied": 7},
+            0x30: {"free": 6, "occupied": 5},
+            0x40: {"free": 4, "occupied": 6}
+        },
+        total_allocated=1500,
+        total_free=1500
+    )
+)
+
 class HeapGroomer:
     """Main class for the heap grooming toolkit."""
     
     def __init__(self):
-        self.console = Console()
+        self.console = _CONSOLE
         self.allocator_analyzer = AllocatorAnalyzer()
         self.heap_manipulator = HeapManipulator()
         self.freelist_analyzer = FreelistAnalyzer()
         self.strategy_generator = StrategyGenerator()
-        self.heap_viewer = HeapViewer()
+        self.heap_viewer = HeapViewer(console=_CONSOLE)
         self.bug_analyzer = BugAnalyzer()
         
     def analyze_allocator(self, events_file: Optional[str] = None) -> None:
         """Analyze allocator behavior."""
-        self.console.print(Panel("Starting Allocator Analysis", title="Phase 1"))
+        self.console.print(_PANELS["phase1"])
         
         if events_file:
-            # Load events from file
-            with open(events_file, 'r') as f:
-                events = json.load(f)
-                for event in events:
+            # Stream events from file one record at a time, so large traces
+            # never have to be held in memory as a whole
+            import ijson
+            with open(events_file, 'rb') as f:
+                for event in ijson.items(f, 'item', use_float=True):
                     self.allocator_analyzer.record_allocation(event)
         else:
             # Interactive mode
@@ -65,7 +131,7 @@ class HeapGroomer:
         
     def generate_spray(self, size: int, count: int, obj_type: str) -> None:
         """Generate heap spray code."""
-        self.console.print(Panel("Generating Heap Spray", title="Phase 2"))
+        self.console.print(_PANELS["phase2"])
         
         config = SprayConfig(
             target_size=size,
@@ -78,7 +144,7 @@ class HeapGroomer:
         
     def analyze_freelist(self, target_size: int) -> None:
         """Analyze freelist behavior."""
-        self.console.print(Panel("Analyzing Freelist", title="Phase 3"))
+        self.console.print(_PANELS["phase3"])
         
         # Register some common objects
         self._register_common_objects()
@@ -92,7 +158,7 @@ class HeapGroomer:
             
     def generate_strategy(self, target_size: int, target_type: str) -> None:
         """Generate grooming strategy."""
-        self.console.print(Panel("Generating Grooming Strategy", title="Phase 4"))
+        self.console.print(_PANELS["phase4"])
         
         strategy = self.strategy_generator.generate_strategy(
             target_size, target_type)
@@ -102,7 +168,7 @@ class HeapGroomer:
         
     def visualize_heap(self) -> None:
         """Visualize heap state."""
-        self.console.print(Panel("Visualizing Heap State", title="Phase 5"))
+        self.console.print(_PANELS["phase5"])
         
         # Generate some sample snapshots
         self._generate_sample_snapshots()
@@ -113,7 +179,7 @@ class HeapGroomer:
         
     def analyze_bug(self, bug_type: str, size: int, offset: int) -> None:
         """Analyze bug scenario."""
-        self.console.print(Panel("Analyzing Bug Scenario", title="Phase 6"))
+        self.console.print(_PANELS["phase6"])
         
         config = BugConfig(
             type=BugType(bug_type),
@@ -134,62 +200,12 @@ class HeapGroomer:
             
     def _register_common_objects(self) -> None:
         """Register common target objects."""
-        common_objects = [
-            ObjectMetadata(
-                name="ArrayBuffer",
-                size=0x20,
-                alignment=8,
-                class_type=ObjectClass.DANGEROUS,
-                dangerous_fields=["data", "length"],
-                vtable_offset=0x8
-            ),
-            ObjectMetadata(
-                name="JSFunction",
-                size=0x30,
-                alignment=8,
-                class_type=ObjectClass.DANGEROUS,
-                dangerous_fields=["code", "scope"],
-                vtable_offset=0x0
-            ),
-            ObjectMetadata(
-                name="TypedArray",
-                size=0x40,
-                alignment=8,
-                class_type=ObjectClass.DANGEROUS,
-                dangerous_fields=["buffer", "length"],
-                vtable_offset=0x8
-            )
-        ]
-        
-        for obj in common_objects:
+        for obj in _COMMON_OBJECTS:
             self.freelist_analyzer.register_object_type(obj)
             
     def _generate_sample_snapshots(self) -> None:
         """Generate sample heap snapshots for visualization."""
-        snapshots = [
-            HeapSnapshot(
-                timestamp=0,
-                bucket_states={
-                    0x20: {"free": 10, "occupied": 5},
-                    0x30: {"free": 8, "occupied": 3},
-                    0x40: {"free": 6, "occupied": 4}
-                },
-                total_allocated=1000,
-                total_free=2000
-            ),
-            HeapSnapshot(
-                timestamp=1,
-                bucket_states={
-                    0x20: {"free": 8, "occupied": 7},
-                    0x30: {"free": 6, "occupied": 5},
-                    0x40: {"free": 4, "occupied": 6}
-                },
-                total_allocated=1500,
-                total_free=1500
-            )
-        ]
-        
-        for snapshot in snapshots:
+        for snapshot in _SAMPLE_SNAPSHOTS:
             self.heap_viewer.add_snapshot(snapshot)
 
 def main():
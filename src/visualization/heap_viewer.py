@@ -3,53 +3,335 @@ Heap visualization module for displaying allocator state and timeline tracking.
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional
-import matplotlib.pyplot as plt
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import struct
 import numpy as np
-from textual.app import App, ComposeResult
-from textual.containers import Container, Vertical
-from textual.widgets import Header, Footer, Static
 from rich.console import Console
 from rich.table import Table
 
-@dataclass
+@dataclass(slots=True, frozen=True, eq=False)
 class HeapSnapshot:
-    """Represents a snapshot of the heap state."""
+    """Represents a snapshot of the heap state.
+    
+    Per-bucket counts are stored as arrays: `bucket_counts[i]` holds the
+    (free, occupied) chunk counts of bucket `bucket_ids[i]`.
+    """
     timestamp: float
-    bucket_states: Dict[int, Dict]  # bucket_index -> {free: int, occupied: int}
+    bucket_ids: np.ndarray  # int64, shape (n_buckets,)
+    bucket_counts: np.ndarray  # int32, shape (n_buckets, 2)
     total_allocated: int
     total_free: int
+    
+    @classmethod
+    def from_bucket_states(cls, timestamp: float,
+                           bucket_states: Dict[int, Dict],
+                           total_allocated: int,
+                           total_free: int) -> "HeapSnapshot":
+        """Build a snapshot from a bucket -> {free, occupied} mapping."""
+        buckets = sorted(bucket_states)
+        bucket_ids = np.array(buckets, dtype=np.int64)
+        bucket_counts = np.array(
+            [(bucket_states[b]["free"], bucket_states[b]["occupied"])
+             for b in buckets],
+            dtype=np.int32
+        ).reshape(-1, 2)
+        
+        # Snapshots may be shared (e.g. module-level samples); keep them immutable
+        bucket_ids.flags.writeable = False
+        bucket_counts.flags.writeable = False
+        
+        return cls(
+            timestamp=timestamp,
+            bucket_ids=bucket_ids,
+            bucket_counts=bucket_counts,
+            total_allocated=total_allocated,
+            total_free=total_free
+        )
+        
+    @property
+    def bucket_states(self) -> Dict[int, Dict]:
+        """Per-bucket counts as bucket_index -> {free: int, occupied: int}."""
+        return {
+            bucket: {"free": free, "occupied": occupied}
+            for bucket, (free, occupied) in zip(self.bucket_ids.tolist(),
+                                                self.bucket_counts.tolist())
+        }
+        
+    def counts_for(self, bucket_ids: np.ndarray) -> np.ndarray:
+        """Get counts aligned to sorted `bucket_ids`; missing buckets are 0."""
+        if np.array_equal(self.bucket_ids, bucket_ids):
+            return self.bucket_counts
+            
+        counts = np.zeros((len(bucket_ids), 2), dtype=np.int32)
+        if len(bucket_ids):
+            cols = np.searchsorted(bucket_ids, self.bucket_ids)
+            known = cols < len(bucket_ids)
+            known[known] = bucket_ids[cols[known]] == self.bucket_ids[known]
+            counts[cols[known]] = self.bucket_counts[known]
+        return counts
 
-class HeapViewer:
-    """Main class for visualizing heap state."""
+# Stream record layout: a fixed header, the bucket ids as int64, then the
+# (free, occupied) counts as int32 pairs
+_RECORD_HEADER = struct.Struct("<dqqI")  # timestamp, allocated, free, n_buckets
+_RECORD_BUCKET_SIZE = 8 + 2 * 4  # int64 id + two int32 counts
+
+def _read_record(f: BinaryIO) -> HeapSnapshot:
+    """Read one snapshot record from a stream file."""
+    timestamp, allocated, free, n_buckets = _RECORD_HEADER.unpack(
+        f.read(_RECORD_HEADER.size))
+    bucket_ids = np.frombuffer(f.read(8 * n_buckets), dtype="<i8")
+    bucket_counts = np.frombuffer(f.read(8 * n_buckets), dtype="<i4")
+    return HeapSnapshot(
+        timestamp=timestamp,
+        bucket_ids=bucket_ids.astype(np.int64),
+        bucket_counts=bucket_counts.astype(np.int32).reshape(-1, 2),
+        total_allocated=allocated,
+        total_free=free
+    )
+
+def _plain_table(title: str, columns: Sequence[str],
+                 rows: Iterable[Sequence[str]]) -> str:
+    """Render a table as tab-separated text."""
+    lines = [title, "\t".join(columns)]
+    lines.extend("\t".join(row) for row in rows)
+    return "\n".join(lines)
+
+class _SnapshotColumns:
+    """Column-oriented copy of snapshot counts, used for plotting.
+    
+    The bucket set is fixed by the first snapshot; arrays double on demand.
+    """
     
     def __init__(self):
+        self.buckets: Optional[np.ndarray] = None
+        self.count = 0
+        self._ts = np.empty(0, dtype=np.float64)
+        self._free = np.empty((0, 0), dtype=np.int32)
+        self._occ = np.empty((0, 0), dtype=np.int32)
+        self._totals = np.empty((0, 2), dtype=np.int64)  # allocated, free
+        
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Snapshot timestamps."""
+        return self._ts[:self.count]
+        
+    @property
+    def free(self) -> np.ndarray:
+        """Free chunks, one column per bucket."""
+        return self._free[:self.count]
+        
+    @property
+    def occupied(self) -> np.ndarray:
+        """Occupied chunks, one column per bucket."""
+        return self._occ[:self.count]
+        
+    @property
+    def totals(self) -> np.ndarray:
+        """Total allocated and free bytes."""
+        return self._totals[:self.count]
+        
+    def append(self, snapshot: HeapSnapshot) -> None:
+        """Append a snapshot's counts to the column arrays."""
+        if self.buckets is None:
+            self.buckets = np.sort(snapshot.bucket_ids)
+            
+        n = self.count
+        if n == len(self._ts):
+            self._grow(max(2 * n, 64))
+            
+        self._ts[n] = snapshot.timestamp
+        counts = snapshot.counts_for(self.buckets)
+        self._free[n] = counts[:, 0]
+        self._occ[n] = counts[:, 1]
+        self._totals[n] = (snapshot.total_allocated, snapshot.total_free)
+        self.count = n + 1
+        
+    def _grow(self, capacity: int) -> None:
+        """Reallocate the column arrays with room for `capacity` rows."""
+        n = self.count
+        width = len(self.buckets) if self.buckets is not None else 0
+        
+        ts = np.empty(capacity, dtype=np.float64)
+        free = np.empty((capacity, width), dtype=np.int32)
+        occ = np.empty((capacity, width), dtype=np.int32)
+        totals = np.empty((capacity, 2), dtype=np.int64)
+        
+        if n:
+            ts[:n] = self._ts[:n]
+            free[:n] = self._free[:n]
+            occ[:n] = self._occ[:n]
+            totals[:n] = self._totals[:n]
+        
+        self._ts, self._free, self._occ, self._totals = ts, free, occ, totals
+
+class HeapViewer:
+    """Main class for visualizing heap state.
+    
+    With `stream_path` set, snapshots are appended to a binary log on disk
+    instead of being kept in `snapshots`, and are read back on demand. An
+    existing log is only replaced when `overwrite` is set; use `load_stream`
+    to open one for reading.
+    """
+    
+    def __init__(self, stream_path: Optional[str] = None,
+                 console: Optional[Console] = None,
+                 overwrite: bool = False):
         self.snapshots: List[HeapSnapshot] = []
-        self.console = Console()
+        self.console = console or Console()
+        self.stream_path = stream_path
+        
+        self._columns = _SnapshotColumns()
+        self._stream: Optional[BinaryIO] = None
+        self._offsets: List[int] = []  # Record offsets in the stream
+        self._latest: Optional[HeapSnapshot] = None
+        self._closed = False
+        self.version = 0  # Bumped on every add_snapshot
+        if stream_path:
+            # "xb" refuses to clobber an existing log
+            self._stream = open(stream_path, "wb" if overwrite else "xb")
+            
+    @classmethod
+    def load_stream(cls, stream_path: str,
+                    console: Optional[Console] = None) -> "HeapViewer":
+        """Open an existing snapshot log for reading.
+        
+        The returned viewer is closed for writing. A record truncated by an
+        interrupted run is ignored.
+        """
+        viewer = cls(console=console)
+        viewer.stream_path = stream_path
+        viewer._closed = True
+        
+        with open(stream_path, "rb") as f:
+            while True:
+                offset = f.tell()
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    break
+                n_buckets = _RECORD_HEADER.unpack(header)[3]
+                body_size = _RECORD_BUCKET_SIZE * n_buckets
+                if len(f.read(body_size)) < body_size:
+                    break
+                viewer._offsets.append(offset)
+                
+            if viewer._offsets:
+                f.seek(viewer._offsets[-1])
+                viewer._latest = _read_record(f)
+                
+        viewer.version = len(viewer._offsets)
+        return viewer
+        
+    def __enter__(self) -> "HeapViewer":
+        return self
+        
+    def __exit__(self, *exc_info) -> None:
+        self.close()
         
     def add_snapshot(self, snapshot: HeapSnapshot) -> None:
         """Add a new heap snapshot."""
-        self.snapshots.append(snapshot)
+        if self.stream_path is None:
+            self.version += 1
+            self.snapshots.append(snapshot)
+            self._columns.append(snapshot)
+            return
+            
+        if self._closed:
+            raise ValueError(f"Snapshot stream {self.stream_path} is closed")
+            
+        self.version += 1
+        self._offsets.append(self._stream.tell())
+        self._stream.write(_RECORD_HEADER.pack(
+            snapshot.timestamp,
+            snapshot.total_allocated,
+            snapshot.total_free,
+            len(snapshot.bucket_ids)
+        ))
+        self._stream.write(snapshot.bucket_ids.astype("<i8").tobytes())
+        self._stream.write(snapshot.bucket_counts.astype("<i4").tobytes())
+        self._latest = snapshot
+        
+    def snapshot_count(self) -> int:
+        """Get the number of recorded snapshots."""
+        if self.stream_path is None:
+            return len(self.snapshots)
+        return len(self._offsets)
+        
+    def latest_snapshot(self) -> Optional[HeapSnapshot]:
+        """Get the most recent snapshot, if any."""
+        if self.stream_path is None:
+            return self.snapshots[-1] if self.snapshots else None
+        return self._latest
+        
+    def get_snapshot(self, index: int) -> HeapSnapshot:
+        """Get a snapshot by index, reading it back from the stream if needed."""
+        if self.stream_path is None:
+            return self.snapshots[index]
+            
+        self._flush()
+        with open(self.stream_path, "rb") as f:
+            f.seek(self._offsets[index])
+            return _read_record(f)
+            
+    def iter_snapshots(self) -> Iterator[HeapSnapshot]:
+        """Iterate over all snapshots in order."""
+        if self.stream_path is None:
+            yield from self.snapshots
+            return
+            
+        self._flush()
+        with open(self.stream_path, "rb") as f:
+            for _ in range(len(self._offsets)):
+                yield _read_record(f)
+                
+    def close(self) -> None:
+        """Close the snapshot stream, if any; recorded snapshots stay readable."""
+        if self._stream is not None and not self._closed:
+            self._stream.close()
+        self._closed = True
+        
+    def _flush(self) -> None:
+        """Make buffered records visible to readers of the stream file."""
+        if self._stream is not None and not self._closed:
+            self._stream.flush()
+            
+    def _load_columns(self) -> _SnapshotColumns:
+        """Get the column arrays, streaming them in from disk if needed."""
+        if self.stream_path is None:
+            return self._columns
+            
+        columns = _SnapshotColumns()
+        for snapshot in self.iter_snapshots():
+            columns.append(snapshot)
+        return columns
         
     def plot_timeline(self, save_path: Optional[str] = None) -> None:
         """Plot heap state evolution over time."""
-        if not self.snapshots:
+        if not self.snapshot_count():
             return
             
         # Prepare data
-        timestamps = [s.timestamp for s in self.snapshots]
-        buckets = sorted(list(self.snapshots[0].bucket_states.keys()))
+        columns = self._load_columns()
+        timestamps = columns.timestamps
         
-        # Create figure
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
+        # Create figure. When saving, draw on a bare Agg canvas so pyplot's
+        # figure manager and GUI backend are never touched. matplotlib is
+        # imported here so that non-plotting callers never load it.
+        if save_path:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+            
+            fig = Figure(figsize=(12, 8))
+            FigureCanvasAgg(fig)
+        else:
+            import matplotlib.pyplot as plt
+            
+            fig = plt.figure(figsize=(12, 8))
+        ax1, ax2 = fig.subplots(2, 1)
         
         # Plot per-bucket state
-        for bucket in buckets:
-            free = [s.bucket_states[bucket]["free"] for s in self.snapshots]
-            occupied = [s.bucket_states[bucket]["occupied"] for s in self.snapshots]
-            
-            ax1.plot(timestamps, free, label=f"Bucket {bucket} (Free)")
-            ax1.plot(timestamps, occupied, '--', label=f"Bucket {bucket} (Occupied)")
+        for k, bucket in enumerate(columns.buckets):
+            ax1.plot(timestamps, columns.free[:, k], label=f"Bucket {bucket} (Free)")
+            ax1.plot(timestamps, columns.occupied[:, k], '--', label=f"Bucket {bucket} (Occupied)")
             
         ax1.set_title("Per-Bucket State Evolution")
         ax1.set_xlabel("Time")
@@ -58,11 +340,8 @@ class HeapViewer:
         ax1.grid(True)
         
         # Plot total state
-        total_allocated = [s.total_allocated for s in self.snapshots]
-        total_free = [s.total_free for s in self.snapshots]
-        
-        ax2.plot(timestamps, total_allocated, label="Total Allocated")
-        ax2.plot(timestamps, total_free, label="Total Free")
+        ax2.plot(timestamps, columns.totals[:, 0], label="Total Allocated")
+        ax2.plot(timestamps, columns.totals[:, 1], label="Total Free")
         
         ax2.set_title("Total Heap State")
         ax2.set_xlabel("Time")
@@ -70,109 +349,107 @@ class HeapViewer:
         ax2.legend()
         ax2.grid(True)
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         if save_path:
-            plt.savefig(save_path)
+            fig.savefig(save_path)
         else:
             plt.show()
             
     def print_current_state(self) -> None:
         """Print current heap state in a formatted table."""
-        if not self.snapshots:
+        current = self.latest_snapshot()
+        if current is None:
             return
-            
-        current = self.snapshots[-1]
-        
-        # Create table
-        table = Table(title="Current Heap State")
-        table.add_column("Bucket")
-        table.add_column("Free Chunks")
-        table.add_column("Occupied Chunks")
-        table.add_column("Total Size")
         
-        for bucket, state in current.bucket_states.items():
-            total_size = (state["free"] + state["occupied"]) * bucket
-            table.add_row(
+        columns = ("Bucket", "Free Chunks", "Occupied Chunks", "Total Size")
+        total_sizes = current.bucket_counts.sum(axis=1, dtype=np.int64) * current.bucket_ids
+        rows = []
+        for bucket, (free, occupied), total_size in zip(current.bucket_ids.tolist(),
+                                                        current.bucket_counts.tolist(),
+                                                        total_sizes.tolist()):
+            rows.append((
                 str(bucket),
-                str(state["free"]),
-                str(state["occupied"]),
+                str(free),
+                str(occupied),
                 f"{total_size:,} bytes"
-            )
+            ))
             
         # Add totals row
-        table.add_row(
+        rows.append((
             "TOTAL",
             str(current.total_free),
             str(current.total_allocated),
             f"{current.total_free + current.total_allocated:,} bytes"
-        )
+        ))
         
-        self.console.print(table)
+        self._print_table("Current Heap State", columns, rows)
         
     def show_diff(self, snapshot1: int, snapshot2: int) -> None:
         """Show differences between two snapshots."""
-        if not (0 <= snapshot1 < len(self.snapshots) and 
-                0 <= snapshot2 < len(self.snapshots)):
+        count = self.snapshot_count()
+        if not (0 <= snapshot1 < count and 0 <= snapshot2 < count):
             return
             
-        s1 = self.snapshots[snapshot1]
-        s2 = self.snapshots[snapshot2]
+        s1 = self.get_snapshot(snapshot1)
+        s2 = self.get_snapshot(snapshot2)
         
-        table = Table(title=f"Heap State Diff (Snapshot {snapshot1} -> {snapshot2})")
-        table.add_column("Bucket")
-        table.add_column("Free Δ")
-        table.add_column("Occupied Δ")
+        buckets = np.union1d(s1.bucket_ids, s2.bucket_ids)
+        diff = s2.counts_for(buckets) - s1.counts_for(buckets)
+        changed = np.any(diff != 0, axis=1)
         
-        for bucket in sorted(set(s1.bucket_states.keys()) | set(s2.bucket_states.keys())):
-            state1 = s1.bucket_states.get(bucket, {"free": 0, "occupied": 0})
-            state2 = s2.bucket_states.get(bucket, {"free": 0, "occupied": 0})
-            
-            free_diff = state2["free"] - state1["free"]
-            occupied_diff = state2["occupied"] - state1["occupied"]
-            
-            if free_diff != 0 or occupied_diff != 0:
-                table.add_row(
-                    str(bucket),
-                    str(free_diff),
-                    str(occupied_diff)
-                )
+        rows = []
+        for bucket, (free_diff, occupied_diff) in zip(buckets[changed].tolist(),
+                                                      diff[changed].tolist()):
+            rows.append((
+                str(bucket),
+                str(free_diff),
+                str(occupied_diff)
+            ))
                 
-        self.console.print(table)
-
-class HeapViewerApp(App):
-    """Textual application for interactive heap visualization."""
-    
-    def __init__(self, viewer: HeapViewer):
-        super().__init__()
-        self.viewer = viewer
-        
-    def compose(self) -> ComposeResult:
-        """Create child widgets for the app."""
-        yield Header()
-        yield Container(
-            Static(self._generate_state_table()),
-            id="state"
+        self._print_table(
+            f"Heap State Diff (Snapshot {snapshot1} -> {snapshot2})",
+            ("Bucket", "Free Δ", "Occupied Δ"),
+            rows
         )
-        yield Footer()
         
-    def _generate_state_table(self) -> str:
-        """Generate the current state table."""
-        if not self.viewer.snapshots:
-            return "No snapshots available"
-            
-        current = self.viewer.snapshots[-1]
-        table = Table(title="Current Heap State")
+    def diffs_all(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Diff every pair of consecutive snapshots.
         
-        table.add_column("Bucket")
-        table.add_column("Free")
-        table.add_column("Occupied")
+        Returns the sorted bucket ids seen in any snapshot, and an int32
+        array of shape (n_snapshots - 1, n_buckets, 2) with the free and
+        occupied deltas over those buckets. A bucket absent from a snapshot
+        counts as zero there, as in `show_diff`.
+        """
+        buckets = np.empty(0, dtype=np.int64)
+        for snapshot in self.iter_snapshots():
+            buckets = np.union1d(buckets, snapshot.bucket_ids)
+            
+        counts = np.zeros((self.snapshot_count(), len(buckets), 2), dtype=np.int32)
+        for i, snapshot in enumerate(self.iter_snapshots()):
+            counts[i] = snapshot.counts_for(buckets)
+        return buckets, np.diff(counts, axis=0)
         
-        for bucket, state in current.bucket_states.items():
-            table.add_row(
-                str(bucket),
-                str(state["free"]),
-                str(state["occupied"])
-            )
+    def _print_table(self, title: str, columns: Sequence[str],
+                     rows: List[Tuple[str, ...]]) -> None:
+        """Print rows as a Rich table, or as plain text when not on a terminal."""
+        if not self.console.is_terminal:
+            # Piped or redirected output: skip Rich's layout and styling, but
+            # still go through the console so capture and recording see it
+            self.console.out(_plain_table(title, columns, rows), highlight=False)
+            return
+            
+        table = Table(title=title)
+        for column in columns:
+            table.add_column(column)
+        for row in rows:
+            table.add_row(*row)
             
-        return str(table) 
\ No newline at end of file
+        self.console.print(table)
+
+def __getattr__(name: str):
+    """Import HeapViewerApp (and with it textual) only when it is requested."""
+    if name == "HeapViewerApp":
+        from visualization.heap_viewer_app import HeapViewerApp
+        return HeapViewerApp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
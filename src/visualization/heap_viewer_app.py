@@ -0,0 +1,72 @@
+"""
+Interactive Textual front end for the heap viewer.
+
+Kept separate from heap_viewer so that importing HeapViewer does not pull
+in textual.
+"""
+
+from typing import Optional, Tuple
+from textual.app import App, ComposeResult
+from textual.containers import Container, Vertical
+from textual.widgets import Header, Footer, Static
+from rich.table import Table
+
+from visualization.heap_viewer import HeapViewer, _plain_table
+
+class HeapViewerApp(App):
+    """Textual application for interactive heap visualization."""
+    
+    def __init__(self, viewer: HeapViewer):
+        super().__init__()
+        self.viewer = viewer
+        self._cached: Tuple[Optional[int], str] = (None, "")  # (version, table)
+        
+    def compose(self) -> ComposeResult:
+        """Create child widgets for the app."""
+        yield Header()
+        yield Container(
+            Static(self._generate_state_table()),
+            id="state"
+        )
+        yield Footer()
+        
+    def _generate_state_table(self) -> str:
+        """Generate the current state table, reusing it until snapshots change."""
+        version, rendered = self._cached
+        if version == self.viewer.version:
+            return rendered
+            
+        rendered = self._render_state_table()
+        self._cached = (self.viewer.version, rendered)
+        return rendered
+        
+    def _render_state_table(self) -> str:
+        """Render the current state table."""
+        current = self.viewer.latest_snapshot()
+        if current is None:
+            return "No snapshots available"
+        
+        if not self.viewer.console.is_terminal:
+            return _plain_table(
+                "Current Heap State",
+                ("Bucket", "Free", "Occupied"),
+                ((str(bucket), str(free), str(occupied))
+                 for bucket, (free, occupied) in zip(current.bucket_ids.tolist(),
+                                                     current.bucket_counts.tolist()))
+            )
+            
+        table = Table(title="Current Heap State")
+        
+        table.add_column("Bucket")
+        table.add_column("Free")
+        table.add_column("Occupied")
+        
+        for bucket, (free, occupied) in zip(current.bucket_ids.tolist(),
+                                            current.bucket_counts.tolist()):
+            table.add_row(
+                str(bucket),
+                str(free),
+                str(occupied)
+            )
+            
+        return str(table) 
\ No newline at end of file